@@ -4,15 +4,21 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import hashlib
+import http.client
+import io
 import json
 import os
 import platform
 import secrets
+import shutil
 import socket
 import subprocess
 import sys
 import tarfile
 import tempfile
+import time
 import urllib.request
 
 GITHUB_RELEASE_URL = (
@@ -27,22 +33,27 @@ FALLBACK_SERVER_VERSION = "1.109.5"
 PKG_VERSION = _pkg_version("portable-ovscode")
 
 SUPPORTED_PLATFORMS = {"linux"}
-SUPPORTED_ARCHS = {"x86_64", "amd64", "aarch64", "arm64"}
+# platform.machine() -> openvscode-server release arch
+_ARCH_MAP = {"x86_64": "x64", "amd64": "x64", "aarch64": "arm64", "arm64": "arm64"}
+SUPPORTED_ARCHS = set(_ARCH_MAP)
+
+# Host identity can't change while we run; look it up once at import
+_SYSTEM = platform.system().lower()
+_MACHINE = platform.machine().lower()
+_ARCH = _ARCH_MAP.get(_MACHINE, "armhf" if _MACHINE.startswith("arm") else "x64")
 
 
 def check_platform() -> None:
-    system = platform.system().lower()
-    machine = platform.machine().lower()
-    if system not in SUPPORTED_PLATFORMS:
+    if _SYSTEM not in SUPPORTED_PLATFORMS:
         print(
-            f"[portable-ovscode] ERROR: unsupported platform: {system} "
+            f"[portable-ovscode] ERROR: unsupported platform: {_SYSTEM} "
             f"(only Linux is supported)",
             file=sys.stderr,
         )
         sys.exit(1)
-    if machine not in SUPPORTED_ARCHS:
+    if _MACHINE not in SUPPORTED_ARCHS:
         print(
-            f"[portable-ovscode] ERROR: unsupported architecture: {machine} "
+            f"[portable-ovscode] ERROR: unsupported architecture: {_MACHINE} "
             f"(supported: x86_64, arm64)",
             file=sys.stderr,
         )
@@ -50,14 +61,7 @@ def check_platform() -> None:
 
 
 def detect_arch() -> str:
-    machine = platform.machine().lower()
-    if machine in ("x86_64", "amd64"):
-        return "x64"
-    if machine in ("aarch64", "arm64"):
-        return "arm64"
-    if machine.startswith("arm"):
-        return "armhf"
-    return "x64"
+    return _ARCH
 
 
 def download_url(version: str, arch: str) -> str:
@@ -65,8 +69,125 @@ def download_url(version: str, arch: str) -> str:
     return f"{GITHUB_RELEASE_URL}/openvscode-server-v{version}/{name}.tar.gz"
 
 
-def install(install_dir: str, version: str) -> str:
-    """Download and extract openvscode-server. Returns path to binary."""
+class _ResumableDownload(io.RawIOBase):
+    """HTTP response body that resumes with a Range request if the transfer drops.
+
+    The ETag (or Last-Modified) of the first response is sent as If-Range,
+    so a resumed request only continues if the asset is unchanged.
+    """
+
+    def __init__(self, url: str, max_resumes: int = 3, timeout: float = 30.0) -> None:
+        self._url = url
+        self._resumes_left = max_resumes
+        self._timeout = timeout
+        self._pos = 0
+        self._validator: str | None = None
+        self._resp = self._open()
+
+    def _open(self) -> http.client.HTTPResponse:
+        headers = {}
+        if self._pos:
+            headers["Range"] = f"bytes={self._pos}-"
+            if self._validator:
+                headers["If-Range"] = self._validator
+        req = urllib.request.Request(self._url, headers=headers)
+        resp = urllib.request.urlopen(req, timeout=self._timeout)
+        if not self._pos:
+            self._validator = resp.headers.get("ETag") or resp.headers.get(
+                "Last-Modified"
+            )
+        return resp
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while True:
+            try:
+                n = self._resp.readinto(b)
+                if not n and self._resp.length:
+                    # A clean close before Content-Length reads as EOF here
+                    raise http.client.IncompleteRead(b"", self._resp.length)
+            except (OSError, http.client.HTTPException) as exc:
+                if not self._resumes_left:
+                    raise
+                self._resumes_left -= 1
+                print(
+                    f"[portable-ovscode] download interrupted ({exc!r}), "
+                    f"resuming at byte {self._pos}",
+                    file=sys.stderr,
+                )
+                self._resp.close()
+                self._resp = self._open()
+                if self._resp.status != 206:
+                    # Range ignored or asset changed; can't splice the stream
+                    raise
+                continue
+            self._pos += n
+            return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._resp.close()
+        super().close()
+
+
+class _HashingReader(io.RawIOBase):
+    """Raw reader that feeds every byte it passes through into a hash."""
+
+    def __init__(self, raw: io.RawIOBase, digest) -> None:
+        self._raw = raw
+        self.digest = digest
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = self._raw.readinto(b)
+        if n:
+            self.digest.update(memoryview(b)[:n])
+        return n
+
+
+def _extract_tarball(fileobj: io.BufferedIOBase, install_dir: str) -> None:
+    """Extract a .tar.gz stream into install_dir, preferring the system tar.
+
+    Raises CalledProcessError if tar fails, or TarError from the fallback.
+    """
+    cmd = ["tar", "-xzf", "-", "-C", install_dir]
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            bufsize=0,
+        )
+    except FileNotFoundError:
+        # 2 MiB copy buffer (default 16 KiB) for the large JS/node files
+        with tarfile.open(
+            fileobj=fileobj, mode="r|gz", copybufsize=2 * 1024 * 1024
+        ) as tar:
+            tar.extractall(path=install_dir)
+        return
+
+    try:
+        shutil.copyfileobj(fileobj, proc.stdin, 1024 * 1024)
+    except BrokenPipeError:
+        pass  # tar exited early; its status is reported below
+    finally:
+        proc.stdin.close()
+        returncode = proc.wait()
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
+def install(install_dir: str, version: str, sha256: str | None = None) -> str:
+    """Download and extract openvscode-server. Returns path to binary.
+
+    If *sha256* is given, the tarball is hashed while it streams through
+    extraction and the install is discarded on mismatch. An existing
+    install is not re-verified.
+    """
     install_dir = os.path.expanduser(install_dir)
     arch = detect_arch()
     dirname = f"openvscode-server-v{version}-linux-{arch}"
@@ -74,6 +195,12 @@ def install(install_dir: str, version: str) -> str:
 
     if os.path.isfile(binary) and os.access(binary, os.X_OK):
         print(f"[portable-ovscode] already installed: {binary}", file=sys.stderr)
+        if sha256:
+            print(
+                "[portable-ovscode] WARNING: --server-sha256 ignored; "
+                "it is only checked when downloading",
+                file=sys.stderr,
+            )
         return binary
 
     url = download_url(version, arch)
@@ -81,20 +208,45 @@ def install(install_dir: str, version: str) -> str:
 
     os.makedirs(install_dir, exist_ok=True)
 
-    with tempfile.NamedTemporaryFile(suffix=".tar.gz", delete=False) as tmp:
-        tmp_path = tmp.name
-        urllib.request.urlretrieve(url, tmp_path)
-
+    # Extract into a staging dir and move the version dir into place only
+    # once it is complete, so an interrupted install never looks installed.
+    staging = tempfile.mkdtemp(prefix=".download-", dir=install_dir)
     try:
+        # Stream HTTP -> gunzip -> untar so extraction overlaps the download
         print(f"[portable-ovscode] extracting to {install_dir}", file=sys.stderr)
-        with tarfile.open(tmp_path, "r:gz") as tar:
-            tar.extractall(path=install_dir)
+        with _ResumableDownload(url) as resp:
+            raw = _HashingReader(resp, hashlib.sha256()) if sha256 else resp
+            stream = io.BufferedReader(raw, buffer_size=128 * 1024)
+            try:
+                _extract_tarball(stream, staging)
+            except (subprocess.CalledProcessError, tarfile.TarError) as exc:
+                print(f"[portable-ovscode] ERROR: extraction failed: {exc}", file=sys.stderr)
+                sys.exit(1)
+            if sha256:
+                # The extractor may stop at the end-of-archive marker; hash the rest
+                while stream.read(1024 * 1024):
+                    pass
+                actual = raw.digest.hexdigest()
+                # Checked before the rename, so an unverified tree never lands
+                if actual != sha256.lower():
+                    print(
+                        f"[portable-ovscode] ERROR: sha256 mismatch for {url}: "
+                        f"expected {sha256.lower()}, got {actual}",
+                        file=sys.stderr,
+                    )
+                    sys.exit(1)
+                print(f"[portable-ovscode] sha256 verified: {actual}", file=sys.stderr)
+
+        staged = os.path.join(staging, dirname)
+        if not os.path.isfile(os.path.join(staged, "bin", "openvscode-server")):
+            print(f"[portable-ovscode] ERROR: binary not found at {binary}", file=sys.stderr)
+            sys.exit(1)
+
+        # Replace any leftover tree that failed the installed check above
+        shutil.rmtree(os.path.join(install_dir, dirname), ignore_errors=True)
+        os.rename(staged, os.path.join(install_dir, dirname))
     finally:
-        os.unlink(tmp_path)
-
-    if not os.path.isfile(binary):
-        print(f"[portable-ovscode] ERROR: binary not found at {binary}", file=sys.stderr)
-        sys.exit(1)
+        shutil.rmtree(staging, ignore_errors=True)
 
     # convenience symlink
     symlink = os.path.join(install_dir, "ovscode")
@@ -154,10 +306,12 @@ def generate_self_signed_cert(cert_dir: str, host: str) -> tuple[str, str]:
         print(f"[portable-ovscode] reusing existing cert: {cert_path}", file=sys.stderr)
         return cert_path, key_path
 
-    # Use openssl CLI (available on virtually all Linux systems)
+    # Use openssl CLI (available on virtually all Linux systems).
+    # ECDSA P-256 keygen takes ~1ms vs hundreds of ms for RSA-2048.
     san = f"IP:{host}" if _is_ip(host) else f"DNS:{host}"
     cmd = [
-        "openssl", "req", "-x509", "-newkey", "rsa:2048",
+        "openssl", "req", "-x509",
+        "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:P-256",
         "-keyout", key_path, "-out", cert_path,
         "-days", "365", "-nodes",
         "-subj", f"/CN={host}",
@@ -182,6 +336,36 @@ def generate_self_signed_cert(cert_dir: str, host: str) -> tuple[str, str]:
     return cert_path, key_path
 
 
+def _server_supports_tls(binary: str) -> bool:
+    """Return True if openvscode-server accepts --cert/--cert-key itself.
+
+    Probing runs the server's --help, so the answer is cached in a marker
+    file next to the binary; it can only change with a new install.
+    """
+    marker = os.path.join(os.path.dirname(binary), ".portable-ovscode-native-tls")
+    try:
+        with open(marker) as f:
+            return f.read().strip() == "yes"
+    except OSError:
+        pass
+
+    try:
+        result = subprocess.run(
+            [binary, "--help"], capture_output=True, text=True, timeout=30
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False  # transient; probe again next launch
+    supported = "--cert-key" in result.stdout
+
+    try:
+        with open(marker, "w") as f:
+            f.write("yes" if supported else "no")
+    except OSError:
+        pass
+    return supported
+
+
+@functools.lru_cache(maxsize=None)
 def _is_ip(host: str) -> bool:
     try:
         socket.inet_pton(socket.AF_INET, host)
@@ -226,6 +410,15 @@ def main() -> None:
             f"fallback: {FALLBACK_SERVER_VERSION})"
         ),
     )
+    parser.add_argument(
+        "--server-sha256",
+        default=None,
+        metavar="HEX",
+        help=(
+            "Expected sha256 of the server tarball; verified during download "
+            "(not checked if the version is already installed)"
+        ),
+    )
     parser.add_argument(
         "--host",
         default="127.0.0.1",
@@ -277,7 +470,7 @@ def main() -> None:
     check_platform()
 
     server_version = resolve_server_version(args.server_version)
-    binary = install(args.install_dir, server_version)
+    binary = install(args.install_dir, server_version, args.server_sha256)
 
     if args.install_only:
         print(binary)
@@ -298,10 +491,8 @@ def main() -> None:
 
     folder = os.path.abspath(os.path.expanduser(args.folder))
 
+    use_proxy = False
     if use_https:
-        # openvscode-server binds to loopback; HTTPS proxy binds to requested host:port
-        backend_port = _find_free_port()
-
         if args.cert and args.cert_key:
             cert_path, key_path = args.cert, args.cert_key
         else:
@@ -311,7 +502,18 @@ def main() -> None:
             os.makedirs(cert_dir, exist_ok=True)
             cert_path, key_path = generate_self_signed_cert(cert_dir, args.host)
 
-        cmd = [binary, "--host", "127.0.0.1", "--port", str(backend_port)]
+        if _server_supports_tls(binary):
+            # openvscode-server terminates TLS itself on the requested host:port
+            backend_port = port
+            cmd = [
+                binary, "--host", args.host, "--port", str(port),
+                "--cert", cert_path, "--cert-key", key_path,
+            ]
+        else:
+            # openvscode-server binds to loopback; HTTPS proxy binds to requested host:port
+            use_proxy = True
+            backend_port = _find_free_port()
+            cmd = [binary, "--host", "127.0.0.1", "--port", str(backend_port)]
     else:
         backend_port = port
         cmd = [binary, "--host", args.host, "--port", str(port)]
@@ -331,13 +533,11 @@ def main() -> None:
     print(f"[portable-ovscode] starting server", file=sys.stderr)
     print(f"[portable-ovscode] open: {url}", file=sys.stderr)
 
-    if use_https:
+    if use_proxy:
         # Start openvscode-server as subprocess, then run HTTPS proxy
         proc = subprocess.Popen(cmd)
 
-        # Wait briefly for backend to start
-        import time
-        time.sleep(1)
+        _wait_for_backend(backend_port, proc)
 
         from portable_ovscode.proxy import run_tls_proxy
         run_tls_proxy(args.host, port, backend_port, cert_path, key_path)
@@ -357,26 +557,70 @@ def main() -> None:
 
 
 def _find_available_port(host: str, start: int, max_tries: int = 100) -> int:
-    """Try to bind to *start*, then start+1, … Returns the first available port."""
-    for offset in range(max_tries):
-        candidate = start + offset
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.bind((host, candidate))
-                return candidate
-        except OSError:
-            continue
-    # Fallback: let the OS pick one
+    """Try to bind to *start*, then start+1, … Returns the first available port.
+
+    A failed bind() leaves the socket unbound, so a single socket serves
+    every probe and the OS-assigned fallback: one syscall per candidate.
+    """
+    # Resolve once; a hostname would otherwise be looked up on every bind()
+    addr = socket.gethostbyname(host)
+    reserved = None
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind((host, 0))
+        # Like the server itself, don't let TIME_WAIT leftovers of a previous
+        # run make a port look taken; live listeners still fail the bind.
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        for candidate in range(start, start + max_tries):
+            # The preferred port is always tried, even if reserved (maybe for us)
+            if candidate != start:
+                if reserved is None:
+                    # Only read once the preferred port turned out to be taken
+                    reserved = _kernel_reserved_port_ranges()
+                if any(candidate in r for r in reserved):
+                    continue
+            try:
+                s.bind((addr, candidate))
+                return candidate
+            except OSError:
+                continue
+        # Fallback: let the OS pick one
+        s.bind((addr, 0))
         return s.getsockname()[1]
 
 
+def _kernel_reserved_port_ranges() -> tuple[range, ...]:
+    """Port ranges listed in Linux's ip_local_reserved_ports.
+
+    The admin has set these aside for specific services, so other
+    candidates are skipped without probing.
+    """
+    ranges = []
+    try:
+        with open("/proc/sys/net/ipv4/ip_local_reserved_ports") as f:
+            for part in f.read().strip().split(","):
+                if part:
+                    lo, _, hi = part.partition("-")
+                    ranges.append(range(int(lo), int(hi or lo) + 1))
+    except (OSError, ValueError):
+        pass
+    return tuple(ranges)
+
+
 def _find_free_port() -> int:
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.bind(("127.0.0.1", 0))
         return s.getsockname()[1]
 
 
+def _wait_for_backend(port: int, proc: subprocess.Popen, timeout: float = 15.0) -> None:
+    """Poll 127.0.0.1:*port* until it accepts connections, *proc* exits, or *timeout*."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and proc.poll() is None:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+
+
 if __name__ == "__main__":
     main()
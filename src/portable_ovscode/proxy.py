@@ -2,47 +2,132 @@
 
 from __future__ import annotations
 
-import select
+import asyncio
 import socket
 import ssl
 import sys
 import threading
 
 
-def _pipe(src: socket.socket, dst: socket.socket) -> None:
-    """Forward bytes from src to dst until EOF."""
-    try:
-        while True:
-            data = src.recv(65536)
-            if not data:
-                break
-            dst.sendall(data)
-    except (OSError, BrokenPipeError):
-        pass
-    finally:
+# Matches common TCP window scaling defaults
+_BUFSIZE = 128 * 1024
+
+
+class _Pipe(asyncio.BufferedProtocol):
+    """One side of a proxied connection; forwards received bytes to its peer.
+
+    Reads land in a preallocated buffer and are written to the peer
+    transport as a memoryview slice, so no per-chunk bytes object is
+    created. Back-pressure is propagated by pausing reads on this side
+    while the peer's write buffer is full.
+    """
+
+    def __init__(self, peer: _Pipe | None = None) -> None:
+        self.transport: asyncio.Transport | None = None
+        self.peer = peer
+        self._buf = memoryview(bytearray(_BUFSIZE))
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._buf
+
+    def buffer_updated(self, nbytes: int) -> None:
+        peer = self.peer.transport
+        peer.write(self._buf[:nbytes])
+        if peer.get_write_buffer_size():
+            # The peer may keep a reference to the unsent tail instead of
+            # copying it, so hand the buffer over and read into a new one.
+            self._buf = memoryview(bytearray(_BUFSIZE))
+
+    def eof_received(self) -> bool:
+        peer = self.peer.transport
+        if peer.can_write_eof():
+            peer.write_eof()
+        else:
+            # TLS can't half-close; close() still flushes pending data
+            peer.close()
+        # Keep our own transport open for writing where half-close works
+        return self.transport.can_write_eof()
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if self.peer is not None and self.peer.transport is not None:
+            self.peer.transport.close()
+
+    def pause_writing(self) -> None:
+        self.peer.transport.pause_reading()
+
+    def resume_writing(self) -> None:
+        self.peer.transport.resume_reading()
+
+
+class _ClientPipe(_Pipe):
+    """Client side of a proxied connection; dials the backend on accept."""
+
+    def __init__(self, backend_port: int) -> None:
+        super().__init__()
+        self._backend_port = backend_port
+        self._connecting: asyncio.Task | None = None
+        # Client input received before the backend connection is up
+        self._pending: list[bytes] = []
+        self._pending_eof = False
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        super().connection_made(transport)
+        # Pair up front: the backend may start sending as soon as it connects
+        self.peer = _Pipe(self)
+        # Hold client data until there is somewhere to send it
+        transport.pause_reading()  # type: ignore[attr-defined]
+        self._connecting = asyncio.get_running_loop().create_task(self._connect())
+
+    def buffer_updated(self, nbytes: int) -> None:
+        if self.peer.transport is None:
+            # Before 3.11, sslproto delivers app data that came in with the
+            # handshake right after connection_made, despite pause_reading().
+            self._pending.append(bytes(self._buf[:nbytes]))
+            return
+        super().buffer_updated(nbytes)
+
+    def eof_received(self) -> bool:
+        if self.peer.transport is None:
+            self._pending_eof = True
+            return self.transport.can_write_eof()
+        return super().eof_received()
+
+    async def _connect(self) -> None:
+        loop = asyncio.get_running_loop()
         try:
-            dst.shutdown(socket.SHUT_WR)
+            await loop.create_connection(
+                lambda: self.peer, "127.0.0.1", self._backend_port
+            )
         except OSError:
-            pass
+            self.transport.close()
+            return
+
+        backend = self.peer.transport
+        for chunk in self._pending:
+            backend.write(chunk)
+        self._pending.clear()
+        if self._pending_eof:
+            backend.write_eof()
 
+        if self.transport.is_closing():
+            backend.close()
+            return
 
-def _handle(client: socket.socket, backend_addr: tuple[str, int]) -> None:
-    """Connect to backend and bidirectionally pipe data."""
-    backend = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    try:
-        backend.connect(backend_addr)
-    except OSError:
-        client.close()
-        return
+        self.transport.resume_reading()
 
-    t1 = threading.Thread(target=_pipe, args=(client, backend), daemon=True)
-    t2 = threading.Thread(target=_pipe, args=(backend, client), daemon=True)
-    t1.start()
-    t2.start()
-    t1.join()
-    t2.join()
-    client.close()
-    backend.close()
+
+async def _serve(listener: socket.socket, ctx: ssl.SSLContext, backend_port: int) -> None:
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(
+        lambda: _ClientPipe(backend_port),
+        sock=listener,
+        ssl=ctx,
+    )
+    async with server:
+        await server.serve_forever()
 
 
 def run_tls_proxy(
@@ -52,12 +137,23 @@ def run_tls_proxy(
     cert_path: str,
     key_path: str,
 ) -> None:
-    """Run a TLS-terminating TCP proxy in a daemon thread."""
+    """Run a TLS-terminating TCP proxy on an event loop in a daemon thread."""
     ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    if ssl.HAS_TLSv1_3:
+        # Browsers that run openvscode-server all speak TLS 1.3 (1-RTT handshake)
+        ctx.minimum_version = ssl.TLSVersion.TLSv1_3
+    else:
+        ctx.set_ciphers("ECDHE+AESGCM:ECDHE+CHACHA20")
+    ctx.options |= ssl.OP_NO_COMPRESSION
+    ctx.set_alpn_protocols(["http/1.1"])
     ctx.load_cert_chain(cert_path, key_path)
 
+    # Bind here so address errors surface in the caller, not the loop thread
     listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    # Accepted sockets inherit this on Linux; asyncio also sets it per
+    # transport, so small WebSocket frames are never held back by Nagle.
+    listener.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
     listener.bind((host, port))
     listener.listen(128)
 
@@ -66,22 +162,8 @@ def run_tls_proxy(
         file=sys.stderr,
     )
 
-    def accept_loop() -> None:
-        while True:
-            try:
-                raw_client, _ = listener.accept()
-                try:
-                    client = ctx.wrap_socket(raw_client, server_side=True)
-                except ssl.SSLError:
-                    raw_client.close()
-                    continue
-                threading.Thread(
-                    target=_handle,
-                    args=(client, ("127.0.0.1", backend_port)),
-                    daemon=True,
-                ).start()
-            except OSError:
-                break
-
-    thread = threading.Thread(target=accept_loop, daemon=True)
+    thread = threading.Thread(
+        target=lambda: asyncio.run(_serve(listener, ctx, backend_port)),
+        daemon=True,
+    )
     thread.start()
@@ -0,0 +1,263 @@
+"""Tests for downloading and extracting openvscode-server."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+import urllib.error
+from unittest.mock import patch
+
+from portable_ovscode.cli import install
+
+VERSION = "1.0.0"
+DIRNAME = f"openvscode-server-v{VERSION}-linux-x64"
+
+
+class _MockResponse(io.BytesIO):
+    status = 200
+    headers = {"ETag": '"v1"'}
+    length = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class _DroppingResponse(_MockResponse):
+    """Response that fails with a connection reset after *limit* bytes."""
+
+    def __init__(self, data: bytes, limit: int) -> None:
+        super().__init__(data[:limit])
+
+    def readinto(self, b):
+        n = super().readinto(b)
+        if not n:
+            raise ConnectionResetError("connection reset")
+        return n
+
+
+class _TruncatedResponse(_MockResponse):
+    """Response whose server closes cleanly after *limit* of its bytes."""
+
+    def __init__(self, data: bytes, limit: int) -> None:
+        super().__init__(data[:limit])
+        self._total = len(data)
+
+    @property
+    def length(self) -> int:
+        # Bytes still owed per Content-Length, as http.client tracks it
+        return self._total - self.tell()
+
+
+def _make_tarball() -> bytes:
+    """Build an in-memory release tarball with a fake server binary."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        script = b"#!/bin/sh\necho ok\n"
+        info = tarfile.TarInfo(f"{DIRNAME}/bin/openvscode-server")
+        info.size = len(script)
+        info.mode = 0o755
+        tar.addfile(info, io.BytesIO(script))
+
+        blob = os.urandom(3 * 1024 * 1024)
+        info = tarfile.TarInfo(f"{DIRNAME}/node_modules/blob.bin")
+        info.size = len(blob)
+        tar.addfile(info, io.BytesIO(blob))
+    return buf.getvalue()
+
+
+class TestInstall(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.install_dir = self._tmp.name
+        self.tarball = _make_tarball()
+        self.binary = os.path.join(
+            self.install_dir, DIRNAME, "bin", "openvscode-server"
+        )
+
+        patches = [
+            patch("portable_ovscode.cli.detect_arch", return_value="x64"),
+            patch("sys.stderr", new_callable=io.StringIO),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_downloads_and_extracts(self):
+        with patch(
+            "portable_ovscode.cli.urllib.request.urlopen",
+            return_value=_MockResponse(self.tarball),
+        ) as mock_open:
+            binary = install(self.install_dir, VERSION)
+
+        mock_open.assert_called_once()
+        self.assertEqual(binary, self.binary)
+        self.assertTrue(os.access(binary, os.X_OK))
+        self.assertEqual(
+            os.path.getsize(
+                os.path.join(self.install_dir, DIRNAME, "node_modules", "blob.bin")
+            ),
+            3 * 1024 * 1024,
+        )
+        self.assertEqual(
+            os.readlink(os.path.join(self.install_dir, "ovscode")), binary
+        )
+
+    def test_falls_back_to_tarfile_without_system_tar(self):
+        with (
+            patch(
+                "portable_ovscode.cli.urllib.request.urlopen",
+                return_value=_MockResponse(self.tarball),
+            ),
+            patch(
+                "portable_ovscode.cli.subprocess.Popen",
+                side_effect=FileNotFoundError("tar"),
+            ),
+        ):
+            binary = install(self.install_dir, VERSION)
+
+        self.assertEqual(binary, self.binary)
+        self.assertTrue(os.access(binary, os.X_OK))
+
+    def test_resumes_interrupted_download(self):
+        cut = len(self.tarball) // 2
+        resumed = _MockResponse(self.tarball[cut:])
+        resumed.status = 206
+
+        with patch(
+            "portable_ovscode.cli.urllib.request.urlopen",
+            side_effect=[_DroppingResponse(self.tarball, cut), resumed],
+        ) as mock_open:
+            binary = install(self.install_dir, VERSION)
+
+        self.assertTrue(os.access(binary, os.X_OK))
+        self.assertEqual(mock_open.call_count, 2)
+        resume_req = mock_open.call_args_list[1].args[0]
+        self.assertEqual(resume_req.get_header("Range"), f"bytes={cut}-")
+        self.assertEqual(resume_req.get_header("If-range"), '"v1"')
+
+    def test_resumes_download_closed_early(self):
+        cut = len(self.tarball) // 2
+        resumed = _MockResponse(self.tarball[cut:])
+        resumed.status = 206
+
+        with patch(
+            "portable_ovscode.cli.urllib.request.urlopen",
+            side_effect=[_TruncatedResponse(self.tarball, cut), resumed],
+        ) as mock_open:
+            binary = install(self.install_dir, VERSION)
+
+        self.assertTrue(os.access(binary, os.X_OK))
+        self.assertEqual(mock_open.call_count, 2)
+        resume_req = mock_open.call_args_list[1].args[0]
+        self.assertEqual(resume_req.get_header("Range"), f"bytes={cut}-")
+
+    def test_failed_download_is_not_installed(self):
+        cut = len(self.tarball) // 2
+        with patch(
+            "portable_ovscode.cli.urllib.request.urlopen",
+            side_effect=[
+                _DroppingResponse(self.tarball, cut),
+                urllib.error.URLError("network is unreachable"),
+            ],
+        ):
+            with self.assertRaises(OSError):
+                install(self.install_dir, VERSION)
+
+        self.assertEqual(os.listdir(self.install_dir), [])
+
+        with patch(
+            "portable_ovscode.cli.urllib.request.urlopen",
+            return_value=_MockResponse(self.tarball),
+        ) as mock_open:
+            binary = install(self.install_dir, VERSION)
+
+        mock_open.assert_called_once()
+        self.assertTrue(os.access(binary, os.X_OK))
+
+    def test_corrupt_tarball_is_not_installed(self):
+        corrupt = self.tarball[: len(self.tarball) // 2]
+        with patch(
+            "portable_ovscode.cli.urllib.request.urlopen",
+            return_value=_MockResponse(corrupt),
+        ):
+            with self.assertRaises(SystemExit):
+                install(self.install_dir, VERSION)
+
+        self.assertEqual(os.listdir(self.install_dir), [])
+
+    def test_corrupt_tarball_is_not_installed_without_system_tar(self):
+        corrupt = self.tarball[: len(self.tarball) // 2]
+        with (
+            patch(
+                "portable_ovscode.cli.urllib.request.urlopen",
+                return_value=_MockResponse(corrupt),
+            ),
+            patch(
+                "portable_ovscode.cli.subprocess.Popen",
+                side_effect=FileNotFoundError("tar"),
+            ),
+        ):
+            with self.assertRaises(SystemExit):
+                install(self.install_dir, VERSION)
+
+        self.assertEqual(os.listdir(self.install_dir), [])
+
+    def test_verifies_sha256(self):
+        digest = hashlib.sha256(self.tarball).hexdigest()
+        with patch(
+            "portable_ovscode.cli.urllib.request.urlopen",
+            return_value=_MockResponse(self.tarball),
+        ):
+            binary = install(self.install_dir, VERSION, sha256=digest.upper())
+
+        self.assertTrue(os.access(binary, os.X_OK))
+
+    def test_sha256_mismatch_discards_install(self):
+        with patch(
+            "portable_ovscode.cli.urllib.request.urlopen",
+            return_value=_MockResponse(self.tarball),
+        ):
+            with self.assertRaises(SystemExit):
+                install(self.install_dir, VERSION, sha256="0" * 64)
+
+        self.assertEqual(os.listdir(self.install_dir), [])
+
+    def test_warns_sha256_ignored_when_installed(self):
+        with patch(
+            "portable_ovscode.cli.urllib.request.urlopen",
+            return_value=_MockResponse(self.tarball),
+        ):
+            install(self.install_dir, VERSION)
+
+        with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            install(self.install_dir, VERSION, sha256="0" * 64)
+
+        self.assertIn("--server-sha256 ignored", stderr.getvalue())
+
+    def test_skips_download_when_installed(self):
+        with patch(
+            "portable_ovscode.cli.urllib.request.urlopen",
+            return_value=_MockResponse(self.tarball),
+        ):
+            install(self.install_dir, VERSION)
+
+        with patch("portable_ovscode.cli.urllib.request.urlopen") as mock_open:
+            binary = install(self.install_dir, VERSION)
+
+        mock_open.assert_not_called()
+        self.assertEqual(binary, self.binary)
+
+
+if __name__ == "__main__":
+    unittest.main()
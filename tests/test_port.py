@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import socket
 import unittest
+from unittest.mock import patch
 
 from portable_ovscode.cli import _find_available_port
 
@@ -11,11 +12,21 @@ from portable_ovscode.cli import _find_available_port
 class TestFindAvailablePort(unittest.TestCase):
     """Tests for _find_available_port()."""
 
+    def setUp(self):
+        # Keep results independent of the host's reserved-port sysctl
+        p = patch(
+            "portable_ovscode.cli._kernel_reserved_port_ranges", return_value=()
+        )
+        self._reserved = p.start()
+        self.addCleanup(p.stop)
+
     def test_returns_start_when_free(self):
         """When the start port is free, it should be returned directly."""
         # Pick a high ephemeral port that's very likely free
         port = _find_available_port("127.0.0.1", 19750)
         self.assertEqual(port, 19750)
+        # A free start port settles it without reading the reserved ports
+        self._reserved.assert_not_called()
 
     def test_skips_occupied_port(self):
         """When the start port is occupied, the next free one is returned."""
@@ -43,6 +54,7 @@ class TestFindAvailablePort(unittest.TestCase):
 
             port = _find_available_port("127.0.0.1", 19770)
             self.assertEqual(port, 19774)
+            self._reserved.assert_called_once()
         finally:
             for s in blockers:
                 s.close()
@@ -61,6 +73,42 @@ class TestFindAvailablePort(unittest.TestCase):
         finally:
             blocker.close()
 
+    def test_reuses_port_in_time_wait(self):
+        """A port whose only remnant is a TIME_WAIT connection counts as free."""
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(("127.0.0.1", 19785))
+        listener.listen(1)
+        client = socket.create_connection(("127.0.0.1", 19785))
+        conn, _ = listener.accept()
+        # Server side closes first, leaving 127.0.0.1:19785 in TIME_WAIT
+        conn.close()
+        client.recv(1)
+        client.close()
+        listener.close()
+
+        port = _find_available_port("127.0.0.1", 19785)
+        self.assertEqual(port, 19785)
+
+    def test_skips_kernel_reserved_ports(self):
+        """Reserved ports after the start port are skipped without probing."""
+        self._reserved.return_value = (range(19801, 19803),)
+        self.assertEqual(_find_available_port("127.0.0.1", 19800), 19800)
+
+        blocker = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        blocker.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        blocker.bind(("127.0.0.1", 19800))
+        blocker.listen(1)
+        try:
+            self.assertEqual(_find_available_port("127.0.0.1", 19800), 19803)
+        finally:
+            blocker.close()
+
+    def test_tries_reserved_start_port(self):
+        """A reserved start port is still tried first."""
+        self._reserved.return_value = (range(19805, 19806),)
+        self.assertEqual(_find_available_port("127.0.0.1", 19805), 19805)
+
     def test_returned_port_is_actually_bindable(self):
         """The returned port should be bindable."""
         port = _find_available_port("127.0.0.1", 19790)
@@ -0,0 +1,170 @@
+"""Tests for the TLS-terminating proxy."""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import shutil
+import socket
+import ssl
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+from portable_ovscode.cli import _find_free_port, generate_self_signed_cert
+from portable_ovscode.proxy import _ClientPipe, run_tls_proxy
+
+
+def _echo_server() -> socket.socket:
+    """Start a loopback echo server and return its listening socket."""
+    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    srv.bind(("127.0.0.1", 0))
+    srv.listen(8)
+
+    def serve(conn: socket.socket) -> None:
+        with conn:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                conn.sendall(data)
+
+    def accept_loop() -> None:
+        while True:
+            try:
+                conn, _ = srv.accept()
+            except OSError:
+                break
+            threading.Thread(target=serve, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=accept_loop, daemon=True).start()
+    return srv
+
+
+@unittest.skipUnless(shutil.which("openssl"), "openssl not available")
+class TestTlsProxy(unittest.TestCase):
+    """Round-trip data through run_tls_proxy()."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        with patch("sys.stderr", new_callable=io.StringIO):
+            cls.cert_path, cls.key_path = generate_self_signed_cert(
+                cls._tmp.name, "127.0.0.1"
+            )
+        cls.backend = _echo_server()
+        cls.port = _find_free_port()
+        with patch("sys.stderr", new_callable=io.StringIO):
+            run_tls_proxy(
+                "127.0.0.1",
+                cls.port,
+                cls.backend.getsockname()[1],
+                cls.cert_path,
+                cls.key_path,
+            )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.backend.close()
+        cls._tmp.cleanup()
+
+    def _connect(self) -> ssl.SSLSocket:
+        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+        ctx.set_alpn_protocols(["h2", "http/1.1"])
+        raw = socket.create_connection(("127.0.0.1", self.port), timeout=5)
+        return ctx.wrap_socket(raw)
+
+    def _roundtrip(self, payload: bytes, chunk_size: int = 65536) -> bytes:
+        # Echo each chunk before sending the next so neither side's socket
+        # buffers can fill up and deadlock the exchange.
+        received = b""
+        with self._connect() as conn:
+            for i in range(0, len(payload), chunk_size):
+                conn.sendall(payload[i:i + chunk_size])
+                while len(received) < min(i + chunk_size, len(payload)):
+                    chunk = conn.recv(65536)
+                    if not chunk:
+                        return received
+                    received += chunk
+        return received
+
+    def test_small_payload_roundtrip(self):
+        self.assertEqual(self._roundtrip(b"hello"), b"hello")
+
+    def test_large_payload_roundtrip(self):
+        payload = bytes(range(256)) * 4096  # 1 MiB
+        self.assertEqual(self._roundtrip(payload), payload)
+
+    def test_negotiates_tls13_and_http11(self):
+        with self._connect() as conn:
+            self.assertEqual(conn.version(), "TLSv1.3")
+            self.assertEqual(conn.selected_alpn_protocol(), "http/1.1")
+
+    def test_second_proxy_on_same_port_fails(self):
+        with self.assertRaises(OSError):
+            run_tls_proxy(
+                "127.0.0.1",
+                self.port,
+                self.backend.getsockname()[1],
+                self.cert_path,
+                self.key_path,
+            )
+
+    def test_concurrent_connections(self):
+        results: list[bytes] = []
+
+        def worker(i: int) -> None:
+            results.append(self._roundtrip(f"conn-{i}".encode() * 100))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(
+            sorted(results),
+            sorted(f"conn-{i}".encode() * 100 for i in range(16)),
+        )
+
+
+class TestClientPipeEarlyData(unittest.TestCase):
+    """Client input that arrives before the backend connection is up."""
+
+    def test_queues_data_and_eof_until_backend_connects(self):
+        async def scenario() -> list[bytes]:
+            received: list[bytes] = []
+            done = asyncio.Event()
+
+            async def handle(reader, writer):
+                received.append(await reader.read())
+                writer.close()
+                done.set()
+
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+
+            transport = Mock()
+            transport.is_closing.return_value = False
+            pipe = _ClientPipe(port)
+            pipe.connection_made(transport)
+
+            # Delivered immediately after connection_made, as sslproto does
+            # on Python < 3.11 when app data rides along with the handshake.
+            pipe.get_buffer(-1)[:5] = b"early"
+            pipe.buffer_updated(5)
+            pipe.eof_received()
+
+            await pipe._connecting
+            await asyncio.wait_for(done.wait(), 5)
+            server.close()
+            await server.wait_closed()
+            return received
+
+        self.assertEqual(asyncio.run(scenario()), [b"early"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""Tests for server startup in main()."""
+
+from __future__ import annotations
+
+import io
+import os
+import socket
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from portable_ovscode import cli
+from portable_ovscode.cli import _server_supports_tls, _wait_for_backend
+
+
+def _completed(stdout: str = "", returncode: int = 0) -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess([], returncode, stdout=stdout, stderr="")
+
+
+def _unused_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestWaitForBackend(unittest.TestCase):
+    """Tests for _wait_for_backend()."""
+
+    def test_returns_once_port_accepts(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        try:
+            start = time.monotonic()
+            _wait_for_backend(listener.getsockname()[1], Mock(poll=Mock(return_value=None)))
+            self.assertLess(time.monotonic() - start, 1.0)
+        finally:
+            listener.close()
+
+    def test_stops_when_process_exits(self):
+        start = time.monotonic()
+        _wait_for_backend(_unused_port(), Mock(poll=Mock(return_value=1)))
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    def test_gives_up_after_timeout(self):
+        proc = Mock(poll=Mock(return_value=None))
+        start = time.monotonic()
+        _wait_for_backend(_unused_port(), proc, timeout=0.3)
+        elapsed = time.monotonic() - start
+        self.assertGreaterEqual(elapsed, 0.3)
+        self.assertLess(elapsed, 2.0)
+        self.assertGreater(proc.poll.call_count, 1)
+
+
+class TestServerSupportsTls(unittest.TestCase):
+    """Tests for _server_supports_tls()."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.binary = os.path.join(self._tmp.name, "openvscode-server")
+
+    def test_detects_and_caches_support(self):
+        with patch(
+            "portable_ovscode.cli.subprocess.run",
+            return_value=_completed("  --cert <path>\n  --cert-key <path>\n"),
+        ) as mock_run:
+            self.assertTrue(_server_supports_tls(self.binary))
+            self.assertTrue(_server_supports_tls(self.binary))
+        mock_run.assert_called_once()
+
+    def test_caches_missing_support(self):
+        with patch(
+            "portable_ovscode.cli.subprocess.run",
+            return_value=_completed("  --host <ip>\n"),
+        ) as mock_run:
+            self.assertFalse(_server_supports_tls(self.binary))
+            self.assertFalse(_server_supports_tls(self.binary))
+        mock_run.assert_called_once()
+
+    def test_timeout_is_not_cached(self):
+        with patch(
+            "portable_ovscode.cli.subprocess.run",
+            side_effect=subprocess.TimeoutExpired("openvscode-server", 30),
+        ) as mock_run:
+            self.assertFalse(_server_supports_tls(self.binary))
+            self.assertFalse(_server_supports_tls(self.binary))
+        self.assertEqual(mock_run.call_count, 2)
+
+
+class TestMainHttps(unittest.TestCase):
+    """main() with --https: native TLS vs. the TLS proxy."""
+
+    BINARY = "/opt/ovscode/bin/openvscode-server"
+    ARGV = [
+        "portable-ovscode", "--https", "--host", "0.0.0.0", "--port", "4443",
+        "--token", "tkn", "--cert", "/c.pem", "--cert-key", "/k.pem",
+    ]
+
+    def setUp(self):
+        patches = [
+            patch("sys.argv", self.ARGV),
+            patch("sys.stderr", new_callable=io.StringIO),
+            patch("portable_ovscode.cli.check_platform"),
+            patch("portable_ovscode.cli.resolve_server_version", return_value="1.0.0"),
+            patch("portable_ovscode.cli.install", return_value=self.BINARY),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_native_tls_passes_cert_to_server(self):
+        with (
+            patch("portable_ovscode.cli._server_supports_tls", return_value=True),
+            patch(
+                "portable_ovscode.cli.subprocess.run", return_value=_completed()
+            ) as mock_run,
+            patch("portable_ovscode.proxy.run_tls_proxy") as mock_proxy,
+        ):
+            with self.assertRaises(SystemExit):
+                cli.main()
+
+        mock_proxy.assert_not_called()
+        self.assertEqual(
+            mock_run.call_args.args[0],
+            [
+                self.BINARY, "--host", "0.0.0.0", "--port", "4443",
+                "--cert", "/c.pem", "--cert-key", "/k.pem",
+                "--connection-token", "tkn",
+            ],
+        )
+
+    def test_falls_back_to_proxy(self):
+        proc = Mock(returncode=0)
+        with (
+            patch("portable_ovscode.cli._server_supports_tls", return_value=False),
+            patch("portable_ovscode.cli._find_free_port", return_value=40000),
+            patch("portable_ovscode.cli._wait_for_backend"),
+            patch("portable_ovscode.cli.subprocess.Popen", return_value=proc) as mock_popen,
+            patch("portable_ovscode.proxy.run_tls_proxy") as mock_proxy,
+        ):
+            with self.assertRaises(SystemExit):
+                cli.main()
+
+        self.assertEqual(
+            mock_popen.call_args.args[0],
+            [
+                self.BINARY, "--host", "127.0.0.1", "--port", "40000",
+                "--connection-token", "tkn",
+            ],
+        )
+        mock_proxy.assert_called_once_with("0.0.0.0", 4443, 40000, "/c.pem", "/k.pem")
+
+
+if __name__ == "__main__":
+    unittest.main()